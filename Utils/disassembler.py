@@ -1,153 +0,0 @@
-import io
-import sys
-import mmap
-import struct
-
-# Scene binary layout, as written by ProgramBinary:
-#   0x00  u8   stack size
-#   0x01  u16  offset of the first instruction (4-byte aligned)
-#   0x03  3B   reserved
-#   0x06  u16  number of options
-#   0x08  options, (u16 pc, u16 string offset) each
-#   ...   string payloads, NUL-terminated u16 code units
-#   ...   instructions, u32 little endian: opcode in the top byte,
-#         argument in the low 24 bits
-HEADER = struct.Struct("<BHxxxH")
-OPTION = struct.Struct("<HH")
-INSTRUCTION = struct.Struct("<I")
-GLOBAL = struct.Struct("<i")
-
-ARGUMENT_MASK = 0xFFFFFF
-OPCODE_SHIFT = 24
-
-# Opcodes whose encoding is known from compiled scenes. Anything else is
-# printed as OP_<n> with its raw argument.
-OPCODES = {
-    0x00: ("PUSH", True),
-    0x02: ("PRINT", True),
-    0x03: ("PRINTI", False),
-    0x05: ("PRINTSL", True),
-    0x06: ("ENDL", False),
-    0x07: ("DISPLAY", True),
-    0x08: ("SWITCH", True),
-    0x0B: ("READG", True),
-    0x0C: ("WRITEG", True),
-    0x0F: ("CALL", True),
-    0x12: ("ADD", False),
-    0x1E: ("EOX", False),
-}
-PRINTSL = 0x05
-
-
-class Instruction:
-
-    __slots__ = ("pc", "offset", "opcode", "argument")
-
-    def __init__(self, pc, offset, opcode, argument):
-        self.pc = pc
-        self.offset = offset
-        self.opcode = opcode
-        self.argument = argument
-
-    @property
-    def name(self):
-        if self.opcode in OPCODES:
-            return OPCODES[self.opcode][0]
-
-        return "OP_{}".format(self.opcode)
-
-    def __str__(self):
-        has_argument = OPCODES.get(self.opcode, (None, True))[1]
-        if has_argument:
-            return "{} {}".format(self.name, self.argument)
-
-        return self.name
-
-
-class SceneBinary:
-
-    def __init__(self, path):
-        self._file = open(path, "rb")
-        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
-
-        self.stack_size, self.instructions_offset, n_options = \
-            HEADER.unpack_from(self._data, 0)
-
-        self.options = []
-        for i in range(n_options):
-            offset = HEADER.size + i * OPTION.size
-            self.options.append(OPTION.unpack_from(self._data, offset))
-
-    def close(self):
-        self._data.close()
-        self._file.close()
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *args):
-        self.close()
-
-    def __len__(self):
-        return (len(self._data) - self.instructions_offset) // INSTRUCTION.size
-
-    def instruction(self, pc):
-        offset = self.instructions_offset + pc * INSTRUCTION.size
-        word, = INSTRUCTION.unpack_from(self._data, offset)
-
-        return Instruction(pc, offset, word >> OPCODE_SHIFT, word & ARGUMENT_MASK)
-
-    def instructions(self):
-        for pc in range(len(self)):
-            yield self.instruction(pc)
-
-    def string_at(self, offset):
-        end = offset
-        while self._data[end] or self._data[end + 1]:
-            end += 2
-
-        return self._data[offset:end].decode("utf-16-le")
-
-    def string_offsets(self):
-        offsets = {string for _, string in self.options}
-        for instruction in self.instructions():
-            if instruction.opcode == PRINTSL:
-                offsets.add(instruction.argument)
-
-        return sorted(offsets)
-
-    def disassemble(self, stream):
-        stream.write("\n-- STRINGS --\n")
-        for offset in self.string_offsets():
-            stream.write("{} ({}): {!r}\n".format(
-                offset, hex(offset), self.string_at(offset)))
-
-        stream.write("\n-- OPTIONS --\n")
-        for pc, string in self.options:
-            stream.write("PC {} - {!r}\n".format(pc, self.string_at(string)))
-
-        stream.write("\n-- INSTRUCTIONS --\n")
-        stream.write("Stack size: {}\n".format(self.stack_size))
-        for instruction in self.instructions():
-            stream.write("{} ({}): {}\n".format(
-                instruction.pc, hex(instruction.offset), instruction))
-
-
-def read_globals(path):
-    with open(path, "rb") as fd:
-        data = fd.read()
-
-    return [value for value, in GLOBAL.iter_unpack(data)]
-
-
-def disassemble(path):
-    stream = io.StringIO()
-    with SceneBinary(path) as binary:
-        binary.disassemble(stream)
-
-    return stream.getvalue()
-
-
-if __name__ == "__main__":
-    for path in sys.argv[1:]:
-        sys.stdout.write(disassemble(path))
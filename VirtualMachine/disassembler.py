@@ -0,0 +1,229 @@
+import os
+import sys
+import mmap
+import array
+import struct
+import argparse
+
+# Scene binary layout, as observed in compiled scenes:
+#   0x00  u8   stack size
+#   0x01  u16  offset of the first instruction (4-byte aligned)
+#   0x03  3B   not decoded, zero in every sample scene
+#   0x06  u16  number of options
+#   0x08  options, (u16 pc, u16 string offset) each
+#   ...   variable section, NUL-terminated u16 strings
+#   ...   zero padding up to the instruction offset
+#   ...   instructions, u32 little endian: opcode in the top byte,
+#         argument in the low 24 bits
+HEADER = struct.Struct("<BHxxxH")
+OPTION_SIZE = 4
+INSTRUCTION_SIZE = 4
+GLOBAL_SIZE = 4
+
+ARGUMENT_MASK = 0xFFFFFF
+OPCODE_SHIFT = 24
+
+# Opcodes whose encoding is confirmed by compiled scenes, mapped to
+# (name, takes argument). Anything else is printed as OP_<n> <argument>.
+OPCODES = {
+    0x00: ("PUSH", True),
+    0x02: ("PRINT", True),
+    0x03: ("PRINTI", False),
+    0x05: ("PRINTSL", True),
+    0x06: ("ENDL", False),
+    0x07: ("DISPLAY", True),
+    0x08: ("SWITCH", True),
+    0x0B: ("READG", True),
+    0x0C: ("WRITEG", True),
+    0x0F: ("CALL", True),
+    0x12: ("ADD", False),
+    0x1E: ("EOX", False),
+}
+
+
+class BinaryFormatError(Exception):
+    pass
+
+
+def _cast(view, fmt):
+    # memoryview.cast uses native byte order; the binaries are little endian
+    if sys.byteorder == "little":
+        return view.cast(fmt)
+
+    words = array.array(fmt, view)
+    words.byteswap()
+    return memoryview(words)
+
+
+def format_instruction(opcode, argument):
+    name, has_argument = OPCODES.get(opcode, ("OP_{}".format(opcode), True))
+    if has_argument:
+        return "{} {}".format(name, argument)
+
+    return name
+
+
+class SceneBinary:
+
+    def __init__(self, path):
+        with open(path, "rb") as fd:
+            size = os.fstat(fd.fileno()).st_size
+            if size < HEADER.size:
+                raise BinaryFormatError(
+                    "file is {} bytes, shorter than the {}-byte header".format(
+                        size, HEADER.size))
+
+            # The mapping stays valid once the file is closed
+            self._data = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._view = memoryview(self._data)
+        try:
+            self._map_sections(size)
+        except BinaryFormatError:
+            self.close()
+            raise
+
+    def _map_sections(self, size):
+        self.stack_size, self.instructions_offset, n_options = \
+            HEADER.unpack_from(self._data, 0)
+
+        self.variables_offset = HEADER.size + n_options * OPTION_SIZE
+        if self.variables_offset > self.instructions_offset:
+            raise BinaryFormatError(
+                "{} options overlap the instructions at {}".format(
+                    n_options, hex(self.instructions_offset)))
+        if self.instructions_offset > size:
+            raise BinaryFormatError(
+                "instruction offset {} is past the end of the file ({} bytes)".format(
+                    hex(self.instructions_offset), size))
+        if (size - self.instructions_offset) % INSTRUCTION_SIZE:
+            raise BinaryFormatError(
+                "instruction section is {} bytes, not a multiple of {}".format(
+                    size - self.instructions_offset, INSTRUCTION_SIZE))
+
+        self.options = _cast(
+            self._view[HEADER.size:self.variables_offset], "H")
+        self.words = _cast(self._view[self.instructions_offset:], "I")
+
+    def close(self):
+        for name in ("options", "words", "_view"):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+
+        self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.words)
+
+    def option(self, index):
+        return self.options[2 * index], self.options[2 * index + 1]
+
+    def n_options(self):
+        return len(self.options) // 2
+
+    def instruction(self, pc):
+        word = self.words[pc]
+        return word >> OPCODE_SHIFT, word & ARGUMENT_MASK
+
+    def instructions(self):
+        for word in self.words:
+            yield word >> OPCODE_SHIFT, word & ARGUMENT_MASK
+
+    def instruction_offset(self, pc):
+        return self.instructions_offset + pc * INSTRUCTION_SIZE
+
+    def _string_end(self, offset):
+        if offset < self.variables_offset or offset >= self.instructions_offset \
+                or offset % 2:
+            raise BinaryFormatError(
+                "string offset {} is outside the variable section [{}, {})".format(
+                    hex(offset), hex(self.variables_offset),
+                    hex(self.instructions_offset)))
+
+        end = offset
+        while end + 1 < self.instructions_offset:
+            if not (self._data[end] or self._data[end + 1]):
+                return end
+            end += 2
+
+        raise BinaryFormatError(
+            "string at {} is not terminated before the instructions".format(
+                hex(offset)))
+
+    def string_at(self, offset):
+        end = self._string_end(offset)
+        return self._data[offset:end].decode("utf-16-le")
+
+    def variables(self):
+        offset = self.variables_offset
+        end = self.instructions_offset
+        while offset < end:
+            # Alignment padding before the instructions
+            if end - offset < INSTRUCTION_SIZE and end % INSTRUCTION_SIZE == 0 \
+                    and not any(self._view[offset:end]):
+                return
+
+            string_end = self._string_end(offset)
+            yield offset, self._data[offset:string_end].decode("utf-16-le")
+            offset = string_end + 2
+
+    def disassemble(self, stream):
+        stream.write("\n-- VARIABLES --\n")
+        for offset, string in self.variables():
+            stream.write("{} ({}): ('STRING' {})\n".format(
+                offset, hex(offset), string))
+
+        stream.write("\n-- OPTIONS --\n")
+        for i in range(self.n_options()):
+            pc, string = self.option(i)
+            stream.write("PC {} - {} ({}) = ('STRING' {})\n".format(
+                pc, string, hex(string), self.string_at(string)))
+
+        stream.write("\n-- INSTRUCTIONS --\n")
+        stream.write("Stack size: {}\n".format(self.stack_size))
+        for pc, (opcode, argument) in enumerate(self.instructions()):
+            stream.write("{} ({}): {}\n".format(
+                pc, hex(self.instruction_offset(pc)),
+                format_instruction(opcode, argument)))
+
+
+def read_globals(path):
+    with open(path, "rb") as fd:
+        data = fd.read()
+
+    if len(data) % GLOBAL_SIZE:
+        raise BinaryFormatError(
+            "global section is {} bytes, not a multiple of {}".format(
+                len(data), GLOBAL_SIZE))
+
+    return list(_cast(memoryview(data), "i"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Disassemble compiled scene binaries")
+    parser.add_argument("paths", nargs="+", metavar="scene.bin")
+    args = parser.parse_args(argv)
+
+    status = 0
+    for path in args.paths:
+        try:
+            with SceneBinary(path) as binary:
+                sys.stdout.write("== {} ==\n".format(path))
+                binary.disassemble(sys.stdout)
+        except (OSError, ValueError, BinaryFormatError) as error:
+            sys.stderr.write("{}: {}\n".format(path, error))
+            status = 1
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,13 @@
-import struct
+import os
+import sys
+import subprocess
 
-from Utils.disassembler import SceneBinary, disassemble, read_globals
+import pytest
+
+from VirtualMachine.disassembler import (
+    BinaryFormatError, SceneBinary, format_instruction, main, read_globals)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # Scene "A" as compiled to 00000000.bin: "+go" increments global 0 and
 # prints it. Its string section ends at 0x1e, so instructions start at the
@@ -31,16 +38,19 @@ def write(tmp_path, name, data):
     return str(path)
 
 
+def listing(binary):
+    return [format_instruction(*i) for i in binary.instructions()]
+
+
 def test_scene_a(tmp_path):
     path = write(tmp_path, "00000000.bin", SCENE_A)
 
     with SceneBinary(path) as binary:
         assert binary.stack_size == 2
         assert binary.instructions_offset == 0x20
-        assert binary.options == [(7, 12)]
-        assert binary.string_at(12) == "go"
-        assert binary.string_at(18) == "g is "
-        assert [str(i) for i in binary.instructions()] == [
+        assert binary.option(0) == (7, 12)
+        assert list(binary.variables()) == [(12, "go"), (18, "g is ")]
+        assert listing(binary) == [
             "PUSH 1", "READG 0", "ADD", "WRITEG 0", "PRINT 8", "DISPLAY 0",
             "EOX", "SWITCH 1", "PRINTSL 18", "READG 0", "PRINTI", "ENDL",
             "PRINTSL 12", "ENDL",
@@ -53,28 +63,71 @@ def test_scene_b(tmp_path):
     with SceneBinary(path) as binary:
         assert binary.instructions_offset == 0x1c
         assert len(binary) == 14
-        assert str(binary.instruction(2)) == "CALL 52782"
-        assert binary.string_offsets() == [12, 22]
+        assert format_instruction(*binary.instruction(2)) == "CALL 52782"
+        assert list(binary.variables()) == [(12, "back"), (22, "h ")]
 
 
-def test_unknown_opcode(tmp_path):
-    data = SCENE_B[:0x1c] + struct.pack("<I", (0x7f << 24) | 3)
-    path = write(tmp_path, "unknown.bin", data)
+def test_unknown_opcode():
+    assert format_instruction(0x7f, 3) == "OP_127 3"
 
-    with SceneBinary(path) as binary:
-        assert str(binary.instruction(0)) == "OP_127 3"
 
+@pytest.mark.parametrize("data, message", [
+    (b"", "shorter than the 8-byte header"),
+    (SCENE_B[:0x16], "past the end of the file"),
+    (SCENE_B[:0x1e], "not a multiple of 4"),
+    (b"\x02\x08\x00\x00\x00\x00\x01\x00", "overlap the instructions"),
+])
+def test_malformed(tmp_path, data, message):
+    path = write(tmp_path, "bad.bin", data)
+
+    with pytest.raises(BinaryFormatError, match=message):
+        SceneBinary(path)
 
-def test_disassemble(tmp_path):
-    path = write(tmp_path, "00000000.bin", SCENE_A)
-    listing = disassemble(path)
 
-    assert "PC 7 - 'go'\n" in listing
-    assert "Stack size: 2\n" in listing
-    assert "7 (0x3c): SWITCH 1\n" in listing
+def test_string_bounds(tmp_path):
+    # "back" loses its terminator and runs into the instructions
+    data = SCENE_B[:0x0c] + b"b\x00a\x00c\x00k\x00" + SCENE_B[0x1c:]
+    data = data[:1] + bytes([0x14]) + data[2:]
+    path = write(tmp_path, "unterminated.bin", data)
+
+    with SceneBinary(path) as binary:
+        with pytest.raises(BinaryFormatError, match="not terminated"):
+            binary.string_at(12)
+        with pytest.raises(BinaryFormatError, match="outside the variable"):
+            binary.string_at(0x40)
 
 
 def test_read_globals(tmp_path):
     path = write(tmp_path, "global.bin", b"\x05\x00\x00\x00\x03\x00\x00\x00")
 
     assert read_globals(path) == [5, 3]
+
+
+def test_main(tmp_path, capsys):
+    good = write(tmp_path, "00000000.bin", SCENE_A)
+    bad = write(tmp_path, "empty.bin", b"")
+
+    assert main([bad, good]) == 1
+
+    out, err = capsys.readouterr()
+    assert "empty.bin: file is 0 bytes" in err
+    assert "-- VARIABLES --\n12 (0xc): ('STRING' go)\n" in out
+    assert "PC 7 - 12 (0xc) = ('STRING' go)\n" in out
+    assert "7 (0x3c): SWITCH 1\n" in out
+
+
+def test_cli(tmp_path):
+    path = write(tmp_path, "00000001.bin", SCENE_B)
+    result = subprocess.run(
+        [sys.executable, "-m", "VirtualMachine.disassembler", path],
+        cwd=ROOT, capture_output=True, text=True)
+
+    assert result.returncode == 0
+    assert "2 (0x24): CALL 52782\n" in result.stdout
+
+    result = subprocess.run(
+        [sys.executable, "-m", "VirtualMachine.disassembler"],
+        cwd=ROOT, capture_output=True, text=True)
+
+    assert result.returncode == 2
+    assert "usage:" in result.stderr